@@ -3,19 +3,81 @@
 
 import sys
 import os
+import multiprocessing
 
 # Add src to path
 sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
 
+from cryptography.hazmat.backends.openssl.backend import backend
+from cryptography.hazmat.bindings.openssl.binding import Binding
+from cryptography.hazmat.primitives import serialization
+
 from crypto_utils import generate_rsa_keypair, save_private_key, save_public_key
 
 
+def get_openssl_cflags():
+    """Return the compiler flags OpenSSL was built with, or None if not exposed."""
+    binding = Binding()
+    lib = binding.lib
+    if not hasattr(lib, "OpenSSL_version") or not hasattr(lib, "OPENSSL_CFLAGS"):
+        return None
+    return binding.ffi.string(lib.OpenSSL_version(lib.OPENSSL_CFLAGS)).decode('ascii')
+
+
+def check_openssl_build():
+    """Print the OpenSSL build and refuse to run if its flags explicitly mark it no-asm."""
+    print(f"OpenSSL: {backend.openssl_version_text()}")
+    
+    cflags = get_openssl_cflags()
+    if cflags is None:
+        print("   (build flags not exposed by this cryptography version, skipping asm check)")
+        return
+    
+    # OpenSSL 3 keeps the asm choice in per-file defines, so only an explicit marker is trusted
+    if "OPENSSL_NO_ASM" in cflags or "no-asm" in cflags:
+        print("\n❌ Error: OpenSSL was built with no-asm (no hardware AES/SHA acceleration)!")
+        print("   Install the official cryptography wheel, which bundles OpenSSL with asm enabled.")
+        sys.exit(1)
+
+
+def generate_private_key_pem(_=None):
+    """Generate RSA private key in a worker process and return it as PKCS8 PEM."""
+    private_key, _public_key = generate_rsa_keypair()
+    return private_key.private_bytes(
+        encoding=serialization.Encoding.PEM,
+        format=serialization.PrivateFormat.PKCS8,
+        encryption_algorithm=serialization.NoEncryption()
+    )
+
+
+def generate_rsa_keypair_parallel():
+    """
+    Race RSA key generation across all CPU cores and keep the first key found.
+    
+    Prime search time varies a lot between runs, so the fastest of N attempts
+    finishes well before a single attempt on average. The pool is terminated
+    as soon as one key is ready.
+    
+    Returns:
+        Tuple of (private_key, public_key) objects
+    """
+    workers = os.cpu_count() or 1
+    with multiprocessing.Pool(processes=workers) as pool:
+        pem = next(pool.imap_unordered(generate_private_key_pem, range(workers)))
+    
+    # Key objects cannot be pickled, so the winner is passed back as PEM
+    private_key = serialization.load_pem_private_key(pem, password=None)
+    return private_key, private_key.public_key()
+
+
 def main():
     """Generate and save RSA key pair."""
+    check_openssl_build()
+    
     print("Generating RSA 4096-bit key pair...")
     
-    # Generate key pair
-    private_key, public_key = generate_rsa_keypair()
+    # Generate key pair (first of N parallel attempts wins)
+    private_key, public_key = generate_rsa_keypair_parallel()
     
     # Save keys
     private_key_path = "student_private.pem"
@@ -16,12 +16,12 @@ def get_commit_hash():
     """Get the latest commit hash."""
     try:
         result = subprocess.run(
-            ['git', 'log', '-1', '--format=%H'],
+            ['git', 'rev-parse', 'HEAD'],
             capture_output=True,
-            text=True,
             check=True
         )
-        return result.stdout.strip()
+        # Commit hash is 40 ASCII hex chars; decode only the stripped bytes
+        return result.stdout.strip().decode('ascii')
     except subprocess.CalledProcessError as e:
         print(f"Error getting commit hash: {e}")
         sys.exit(1)
@@ -63,7 +63,7 @@ def main():
     print(f"✓ Encrypted signature with RSA/OAEP-SHA256")
     
     # Base64 encode encrypted signature
-    encrypted_signature_b64 = base64.b64encode(encrypted_signature).decode('utf-8')
+    encrypted_signature_b64 = base64.b64encode(encrypted_signature).decode('ascii')
     
     print("\n" + "="*80)
     print("SUBMISSION DATA")
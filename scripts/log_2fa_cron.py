@@ -1,40 +1,62 @@
 #!/usr/bin/env python3
-"""Cron script to log 2FA codes every minute."""
+"""Long-running logger that appends the current 2FA code every minute."""
 
 import sys
 import os
-from datetime import datetime
+import time
 
 # Add src to path
 sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
 
 from crypto_utils import generate_totp_code
-from config import SEED_FILE_PATH
+from config import SEED_FILE_PATH, CRON_OUTPUT_PATH, CRON_INTERVAL
 
 
-def main():
-    """Generate and log current TOTP code."""
+def log_code():
+    """Generate current TOTP code and append it to the output file."""
     try:
-        # Read hex seed from persistent storage
-        if not os.path.exists(SEED_FILE_PATH):
+        # Read hex seed from persistent storage (may be written later by /decrypt-seed)
+        try:
+            with open(SEED_FILE_PATH, 'r') as f:
+                hex_seed = f.read().strip()
+        except FileNotFoundError:
             print(f"Error: Seed file not found at {SEED_FILE_PATH}", file=sys.stderr)
             return
         
-        with open(SEED_FILE_PATH, 'r') as f:
-            hex_seed = f.read().strip()
-        
-        # Generate current TOTP code
+        # Generate current TOTP code (hex decoding is memoized across ticks)
         code = generate_totp_code(hex_seed)
         
         # Get current UTC timestamp
-        timestamp = datetime.utcnow().strftime("%Y-%m-%d %H:%M:%S")
+        timestamp = time.strftime("%Y-%m-%d %H:%M:%S", time.gmtime())
         
-        # Output formatted line (appended by cron to /cron/last_code.txt)
-        print(f"{timestamp} - 2FA Code: {code}")
+        # Append formatted line to /cron/last_code.txt
+        with open(CRON_OUTPUT_PATH, 'a') as f:
+            f.write(f"{timestamp} - 2FA Code: {code}\n")
     
     except Exception as e:
         print(f"Error generating TOTP code: {e}", file=sys.stderr)
 
 
+def main():
+    """Log a code at every interval boundary for the lifetime of the process."""
+    # Absolute wall-clock target (e.g. start of the next minute)
+    next_tick = (int(time.time()) // CRON_INTERVAL + 1) * CRON_INTERVAL
+    while True:
+        # sleep() runs on the monotonic clock; re-check the wall clock so an
+        # NTP slew/step cannot wake us before the boundary
+        now = time.time()
+        if next_tick - now > CRON_INTERVAL:
+            # Clock stepped backwards: re-anchor on the next boundary
+            next_tick = (int(now) // CRON_INTERVAL + 1) * CRON_INTERVAL
+        if now < next_tick:
+            time.sleep(min(next_tick - now, CRON_INTERVAL))
+            continue
+        
+        log_code()
+        
+        # Advance past now, skipping missed boundaries after a forward step
+        next_tick = (int(time.time()) // CRON_INTERVAL + 1) * CRON_INTERVAL
+
+
 if __name__ == "__main__":
     main()
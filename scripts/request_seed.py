@@ -5,6 +5,8 @@ import sys
 import os
 import requests
 import json
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 
 # Add src to path
 sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
@@ -12,6 +14,21 @@ sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
 from config import INSTRUCTOR_API_URL
 
 
+def create_session():
+    """Create HTTP session with connection pooling and retry on transient errors."""
+    session = requests.Session()
+    retry = Retry(
+        total=3,
+        backoff_factor=0.5,
+        status_forcelist=[502, 503, 504],
+        allowed_methods=["POST"],
+        # Return the last 5xx response so raise_for_status() reports its status and body
+        raise_on_status=False
+    )
+    session.mount("https://", HTTPAdapter(max_retries=retry, pool_connections=1, pool_maxsize=1))
+    return session
+
+
 def main():
     """Request encrypted seed from instructor API."""
     if len(sys.argv) != 3:
@@ -34,6 +51,7 @@ def main():
         print("   Run 'python scripts/generate_keys.py' first.")
         sys.exit(1)
     
+    # Text mode normalizes CRLF checkouts (Windows) to LF before sending the PEM
     with open(public_key_path, 'r') as f:
         public_key = f.read()
     
@@ -47,13 +65,15 @@ def main():
     print(f"\nCalling instructor API: {INSTRUCTOR_API_URL}")
     
     try:
-        # Send POST request
-        response = requests.post(
-            INSTRUCTOR_API_URL,
-            json=payload,
-            headers={"Content-Type": "application/json"},
-            timeout=30
-        )
+        # Send POST request (session reuses the TLS connection across retries)
+        with create_session() as session:
+            response = session.post(
+                INSTRUCTOR_API_URL,
+                json=payload,
+                headers={"Content-Type": "application/json"},
+                timeout=30,
+                stream=False
+            )
         
         response.raise_for_status()
         
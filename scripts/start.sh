@@ -0,0 +1,19 @@
+#!/bin/sh
+# Container entrypoint: run the 2FA code logger alongside the API.
+
+# One API worker per CPU, capped at 4 (each worker loads the 4096-bit key)
+WORKERS=$(nproc 2>/dev/null || echo 1)
+if [ "$WORKERS" -gt 4 ]; then
+    WORKERS=4
+fi
+
+# Restart the logger if it ever exits; its errors go to the same file as the
+# codes (as with the old cron entry's 2>&1), so users see them in last_code.txt
+(
+    while true; do
+        python3 /app/scripts/log_2fa_cron.py 2>> "${CRON_OUTPUT_PATH:-/cron/last_code.txt}"
+        sleep 1
+    done
+) &
+
+exec python3 -m uvicorn src.app:app --host 0.0.0.0 --port 8080 --workers "$WORKERS" --loop uvloop --http httptools
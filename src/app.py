@@ -1,27 +1,132 @@
 """FastAPI application for PKI-based 2FA microservice."""
 
+import hmac
 import os
+import tempfile
+from contextlib import asynccontextmanager
+import aiofiles
 from fastapi import FastAPI, HTTPException
+from fastapi.responses import ORJSONResponse
 from pydantic import BaseModel
-from typing import Dict
+from typing import AsyncIterator, Dict, Optional, Tuple
 
 from crypto_utils import (
     load_private_key,
     decrypt_seed,
-    generate_totp_code,
+    build_hmac_proto,
+    generate_totp_code_from_proto,
     get_totp_remaining_seconds,
-    verify_totp_code
+    verify_totp_code_from_proto
 )
 from config import STUDENT_PRIVATE_KEY_PATH, SEED_FILE_PATH, API_HOST, API_PORT
 
-app = FastAPI(title="PKI-based 2FA Microservice")
+# Student private key, loaded once per worker at startup
+student_private_key = None
 
-# Load student private key at startup
-try:
-    student_private_key = load_private_key(STUDENT_PRIVATE_KEY_PATH)
-except Exception as e:
-    print(f"Warning: Could not load student private key: {e}")
-    student_private_key = None
+# In-memory seed cache, refreshed when the seed file changes (possibly from another worker)
+_seed_cache = {"hmac_proto": None, "file_id": None, "bad_file_id": None}
+
+
+def load_student_private_key() -> None:
+    """Load student private key once per worker process."""
+    global student_private_key
+    try:
+        student_private_key = load_private_key(STUDENT_PRIVATE_KEY_PATH)
+    except Exception as e:
+        print(f"Warning: Could not load student private key: {e}")
+        student_private_key = None
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI) -> AsyncIterator[None]:
+    """Worker lifespan: load the private key on startup."""
+    load_student_private_key()
+    yield
+
+
+app = FastAPI(
+    title="PKI-based 2FA Microservice",
+    default_response_class=ORJSONResponse,
+    lifespan=lifespan
+)
+
+
+def _seed_file_id(st: os.stat_result) -> Tuple[int, int]:
+    """Identify a seed file version; os.replace gives every new seed a new inode."""
+    return st.st_ino, st.st_mtime_ns
+
+
+def _cache_seed(hex_seed: str, file_id: Tuple[int, int], seed_bytes: Optional[bytes] = None) -> None:
+    """
+    Store pre-keyed HMAC for the seed and the seed file id in the cache.
+    
+    Raises:
+        ValueError: If seed is not 64 hex characters (32 bytes); cache is left unchanged
+    """
+    if seed_bytes is None:
+        seed_bytes = bytes.fromhex(hex_seed)
+    if len(seed_bytes) != 32:
+        raise ValueError(f"Invalid seed length: {len(seed_bytes)} bytes, expected 32")
+    
+    _seed_cache["hmac_proto"] = build_hmac_proto(seed_bytes)
+    _seed_cache["file_id"] = file_id
+
+
+async def _write_seed_file(hex_seed: str) -> os.stat_result:
+    """
+    Atomically replace the seed file so readers never see a truncated or partial seed.
+    
+    Returns:
+        stat result of the new seed file
+    """
+    seed_dir = os.path.dirname(SEED_FILE_PATH)
+    fd, tmp_path = tempfile.mkstemp(dir=seed_dir, prefix=".seed-", suffix=".tmp")
+    os.close(fd)
+    try:
+        async with aiofiles.open(tmp_path, 'w') as f:
+            await f.write(hex_seed)
+        st = os.stat(tmp_path)
+        os.replace(tmp_path, SEED_FILE_PATH)
+    except BaseException:
+        os.unlink(tmp_path)
+        raise
+    return st
+
+
+async def _load_seed() -> Optional[hmac.HMAC]:
+    """
+    Return cached pre-keyed HMAC for the seed, re-reading persistent storage if it changed.
+    
+    Returns:
+        HMAC context from build_hmac_proto, or None if seed has not been decrypted yet
+    """
+    # Single stat: missing file means no seed; inode/mtime detect seeds written by other workers
+    try:
+        file_id = _seed_file_id(os.stat(SEED_FILE_PATH))
+    except FileNotFoundError:
+        return None
+    
+    # Known-corrupt seed file: don't re-read or re-log until it is replaced
+    if _seed_cache["bad_file_id"] == file_id:
+        return None
+    
+    if _seed_cache["file_id"] != file_id:
+        # Cold start or new seed: read hex seed from persistent storage
+        try:
+            async with aiofiles.open(SEED_FILE_PATH, 'r') as f:
+                hex_seed = (await f.read()).strip()
+        except FileNotFoundError:
+            return None
+        
+        # Corrupt seed file: treat as not decrypted until the file changes
+        try:
+            _cache_seed(hex_seed, file_id)
+        except ValueError as e:
+            print(f"Invalid seed file: {e}")
+            _seed_cache["bad_file_id"] = file_id
+            return None
+    
+    return _seed_cache["hmac_proto"]
 
 
 class DecryptSeedRequest(BaseModel):
@@ -46,14 +151,16 @@ async def decrypt_seed_endpoint(request: DecryptSeedRequest) -> Dict[str, str]:
             raise HTTPException(status_code=500, detail={"error": "Private key not loaded"})
         
         # Decrypt the seed
-        hex_seed = decrypt_seed(request.encrypted_seed, student_private_key)
+        hex_seed, seed_bytes = decrypt_seed(request.encrypted_seed, student_private_key)
         
         # Ensure /data directory exists
         os.makedirs(os.path.dirname(SEED_FILE_PATH), exist_ok=True)
         
-        # Save to persistent storage
-        with open(SEED_FILE_PATH, 'w') as f:
-            f.write(hex_seed)
+        # Save to persistent storage (atomic replace)
+        st = await _write_seed_file(hex_seed)
+        
+        # Refresh in-memory seed cache
+        _cache_seed(hex_seed, _seed_file_id(st), seed_bytes)
         
         return {"status": "ok"}
     
@@ -71,16 +178,13 @@ async def generate_2fa_endpoint() -> Dict:
     Failure: {"error": "Seed not decrypted yet"} (500)
     """
     try:
-        # Check if seed file exists
-        if not os.path.exists(SEED_FILE_PATH):
+        # Load seed from cache (or persistent storage on cold start)
+        hmac_proto = await _load_seed()
+        if hmac_proto is None:
             raise HTTPException(status_code=500, detail={"error": "Seed not decrypted yet"})
         
-        # Read hex seed from persistent storage
-        with open(SEED_FILE_PATH, 'r') as f:
-            hex_seed = f.read().strip()
-        
         # Generate TOTP code
-        code = generate_totp_code(hex_seed)
+        code = generate_totp_code_from_proto(hmac_proto)
         
         # Calculate remaining seconds in current period
         valid_for = get_totp_remaining_seconds()
@@ -112,16 +216,13 @@ async def verify_2fa_endpoint(request: VerifyCodeRequest) -> Dict[str, bool]:
         if not request.code:
             raise HTTPException(status_code=400, detail={"error": "Missing code"})
         
-        # Check if seed file exists
-        if not os.path.exists(SEED_FILE_PATH):
+        # Load seed from cache (or persistent storage on cold start)
+        hmac_proto = await _load_seed()
+        if hmac_proto is None:
             raise HTTPException(status_code=500, detail={"error": "Seed not decrypted yet"})
         
-        # Read hex seed from persistent storage
-        with open(SEED_FILE_PATH, 'r') as f:
-            hex_seed = f.read().strip()
-        
         # Verify TOTP code with ±1 period tolerance
-        is_valid = verify_totp_code(hex_seed, request.code)
+        is_valid = verify_totp_code_from_proto(hmac_proto, request.code)
         
         return {"valid": is_valid}
     
@@ -140,4 +241,11 @@ async def health_check() -> Dict[str, str]:
 
 if __name__ == "__main__":
     import uvicorn
-    uvicorn.run(app, host=API_HOST, port=API_PORT)
+    uvicorn.run(
+        "app:app",
+        host=API_HOST,
+        port=API_PORT,
+        workers=min(4, os.cpu_count() or 1),
+        loop="uvloop",
+        http="httptools"
+    )
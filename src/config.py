@@ -25,3 +25,6 @@ TOTP_ALGORITHM = "SHA1"  # Standard for TOTP
 TOTP_PERIOD = 30  # seconds
 TOTP_DIGITS = 6
 TOTP_VALID_WINDOW = 1  # ±1 period (±30 seconds)
+
+# Code logger configuration
+CRON_INTERVAL = 60  # seconds between logged codes
@@ -1,7 +1,9 @@
 """Cryptographic utilities for RSA and TOTP operations."""
 
 import base64
-import pyotp
+import functools
+import hmac
+import time
 from cryptography.hazmat.primitives import hashes, serialization
 from cryptography.hazmat.primitives.asymmetric import rsa, padding
 from cryptography.hazmat.backends import default_backend
@@ -9,6 +11,21 @@ from typing import Tuple
 
 from config import RSA_KEY_SIZE, RSA_PUBLIC_EXPONENT, TOTP_DIGITS, TOTP_PERIOD, TOTP_VALID_WINDOW
 
+# Padding and hash objects are immutable, so build them once and reuse for every RSA operation
+_SHA256 = hashes.SHA256()
+_OAEP_SHA256 = padding.OAEP(
+    mgf=padding.MGF1(algorithm=_SHA256),
+    algorithm=_SHA256,
+    label=None
+)
+_PSS_SHA256 = padding.PSS(
+    mgf=padding.MGF1(_SHA256),
+    salt_length=padding.PSS.MAX_LENGTH
+)
+
+# Modulus for reducing truncated HMAC value to TOTP_DIGITS digits
+_TOTP_MOD = 10 ** TOTP_DIGITS
+
 
 def generate_rsa_keypair(key_size: int = RSA_KEY_SIZE) -> Tuple[rsa.RSAPrivateKey, rsa.RSAPublicKey]:
     """
@@ -71,7 +88,7 @@ def load_public_key(filepath: str) -> rsa.RSAPublicKey:
     return public_key
 
 
-def decrypt_seed(encrypted_seed_b64: str, private_key: rsa.RSAPrivateKey) -> str:
+def decrypt_seed(encrypted_seed_b64: str, private_key: rsa.RSAPrivateKey) -> Tuple[str, bytes]:
     """
     Decrypt base64-encoded encrypted seed using RSA/OAEP with SHA-256.
     
@@ -80,7 +97,7 @@ def decrypt_seed(encrypted_seed_b64: str, private_key: rsa.RSAPrivateKey) -> str
         private_key: RSA private key object
     
     Returns:
-        Decrypted hex seed (64-character string)
+        Tuple of (hex_seed, seed_bytes): 64-character hex string and its 32 raw bytes
     
     Raises:
         ValueError: If decrypted seed is not valid 64-character hex string
@@ -91,43 +108,97 @@ def decrypt_seed(encrypted_seed_b64: str, private_key: rsa.RSAPrivateKey) -> str
     # RSA/OAEP decrypt with SHA-256
     decrypted_bytes = private_key.decrypt(
         encrypted_seed_bytes,
-        padding.OAEP(
-            mgf=padding.MGF1(algorithm=hashes.SHA256()),
-            algorithm=hashes.SHA256(),
-            label=None
-        )
+        _OAEP_SHA256
     )
     
-    # Decode bytes to UTF-8 string
-    hex_seed = decrypted_bytes.decode('utf-8')
+    # Decode bytes to ASCII string (hex seed is pure ASCII)
+    hex_seed = decrypted_bytes.decode('ascii')
     
     # Validate: must be 64-character hex string
     if len(hex_seed) != 64:
         raise ValueError(f"Invalid seed length: {len(hex_seed)}, expected 64")
     
-    if not all(c in '0123456789abcdef' for c in hex_seed.lower()):
-        raise ValueError("Seed contains non-hexadecimal characters")
+    # Decode in one C-level call; bytes.fromhex skips whitespace, so check length too
+    try:
+        seed_bytes = bytes.fromhex(hex_seed)
+    except ValueError:
+        raise ValueError("Seed contains non-hexadecimal characters") from None
+    if len(seed_bytes) != 32:
+        raise ValueError("Seed contains embedded whitespace")
     
-    return hex_seed
+    return hex_seed, seed_bytes
+
 
+@functools.lru_cache(maxsize=4)
+def _seed_bytes(hex_seed: str) -> bytes:
+    """Decode hex seed to bytes, memoized since the seed rarely changes."""
+    return bytes.fromhex(hex_seed)
 
-def hex_to_base32(hex_seed: str) -> str:
+
+def _truncate(mac: bytes) -> str:
     """
-    Convert 64-character hex seed to base32 encoding for TOTP.
+    Apply RFC 4226 dynamic truncation to an HMAC-SHA1 digest.
     
     Args:
-        hex_seed: 64-character hex string
+        mac: 20-byte HMAC-SHA1 digest
     
     Returns:
-        Base32-encoded seed string
+        Zero-padded TOTP code as string
     """
-    # Convert hex to bytes
-    seed_bytes = bytes.fromhex(hex_seed)
+    off = mac[-1] & 0x0F
+    code_int = int.from_bytes(mac[off:off + 4], 'big') & 0x7fffffff
+    code = code_int % _TOTP_MOD
     
-    # Convert bytes to base32
-    base32_seed = base64.b32encode(seed_bytes).decode('utf-8')
+    return f"{code:0{TOTP_DIGITS}d}"
+
+
+def _totp(seed_bytes: bytes, t: int) -> str:
+    """
+    Compute RFC 6238 TOTP code (HMAC-SHA1 + dynamic truncation) for time step t.
+    
+    Args:
+        seed_bytes: Raw seed bytes used as HMAC key
+        t: Time step counter (unix time // period)
     
-    return base32_seed
+    Returns:
+        Zero-padded TOTP code as string
+    """
+    msg = t.to_bytes(8, 'big')
+    mac = hmac.digest(seed_bytes, msg, 'sha1')
+    return _truncate(mac)
+
+
+def build_hmac_proto(seed_bytes: bytes) -> hmac.HMAC:
+    """
+    Build HMAC-SHA1 context keyed with the seed, to be copied per TOTP computation.
+    
+    The inner/outer key pads are hashed once here. copy() duplicates both SHA1
+    midstates in C, so each counter value only costs its final-block compressions.
+    
+    Args:
+        seed_bytes: Raw seed bytes used as HMAC key
+    
+    Returns:
+        HMAC-SHA1 context with no message data
+    """
+    # Digest name (as in hmac.digest) selects OpenSSL's HMAC, whose copy() keeps the midstates
+    return hmac.new(seed_bytes, None, 'sha1')
+
+
+def _totp_from_proto(hmac_proto: hmac.HMAC, t: int) -> str:
+    """
+    Compute TOTP code for time step t from a pre-keyed HMAC-SHA1 context.
+    
+    Args:
+        hmac_proto: Context from build_hmac_proto (left unmodified)
+        t: Time step counter (unix time // period)
+    
+    Returns:
+        Zero-padded TOTP code as string
+    """
+    m = hmac_proto.copy()
+    m.update(t.to_bytes(8, 'big'))
+    return _truncate(m.digest())
 
 
 def generate_totp_code(hex_seed: str) -> str:
@@ -140,16 +211,21 @@ def generate_totp_code(hex_seed: str) -> str:
     Returns:
         6-digit TOTP code as string
     """
-    # Convert hex seed to base32
-    base32_seed = hex_to_base32(hex_seed)
-    
-    # Create TOTP object with SHA-1, 30s period, 6 digits (standard)
-    totp = pyotp.TOTP(base32_seed, digits=TOTP_DIGITS, interval=TOTP_PERIOD)
+    # Generate current TOTP code (SHA-1, 30s period, 6 digits)
+    return _totp(_seed_bytes(hex_seed), int(time.time()) // TOTP_PERIOD)
+
+
+def generate_totp_code_from_proto(hmac_proto: hmac.HMAC) -> str:
+    """
+    Generate current TOTP code from a pre-keyed HMAC context (skips HMAC key setup).
     
-    # Generate current TOTP code
-    code = totp.now()
+    Args:
+        hmac_proto: Context from build_hmac_proto
     
-    return code
+    Returns:
+        6-digit TOTP code as string
+    """
+    return _totp_from_proto(hmac_proto, int(time.time()) // TOTP_PERIOD)
 
 
 def get_totp_remaining_seconds() -> int:
@@ -159,7 +235,6 @@ def get_totp_remaining_seconds() -> int:
     Returns:
         Remaining seconds (0-29)
     """
-    import time
     current_time = int(time.time())
     remaining = TOTP_PERIOD - (current_time % TOTP_PERIOD)
     return remaining
@@ -177,16 +252,35 @@ def verify_totp_code(hex_seed: str, code: str, valid_window: int = TOTP_VALID_WI
     Returns:
         True if code is valid, False otherwise
     """
-    # Convert hex seed to base32
-    base32_seed = hex_to_base32(hex_seed)
+    hmac_proto = build_hmac_proto(_seed_bytes(hex_seed))
+    return verify_totp_code_from_proto(hmac_proto, code, valid_window)
+
+
+def verify_totp_code_from_proto(
+    hmac_proto: hmac.HMAC,
+    code: str,
+    valid_window: int = TOTP_VALID_WINDOW
+) -> bool:
+    """
+    Verify TOTP code with time window tolerance using a pre-keyed HMAC context.
+    
+    Args:
+        hmac_proto: Context from build_hmac_proto, copied for each counter value
+        code: 6-digit code to verify
+        valid_window: Number of periods before/after to accept (default 1 = ±30s)
     
-    # Create TOTP object
-    totp = pyotp.TOTP(base32_seed, digits=TOTP_DIGITS, interval=TOTP_PERIOD)
+    Returns:
+        True if code is valid, False otherwise
+    """
+    code_bytes = code.encode('utf-8')
+    t = int(time.time()) // TOTP_PERIOD
     
-    # Verify code with time window tolerance
-    is_valid = totp.verify(code, valid_window=valid_window)
+    for dt in range(-valid_window, valid_window + 1):
+        # Constant-time comparison
+        if hmac.compare_digest(_totp_from_proto(hmac_proto, t + dt).encode('ascii'), code_bytes):
+            return True
     
-    return is_valid
+    return False
 
 
 def sign_message(message: str, private_key: rsa.RSAPrivateKey) -> bytes:
@@ -206,11 +300,8 @@ def sign_message(message: str, private_key: rsa.RSAPrivateKey) -> bytes:
     # Sign using RSA-PSS with SHA-256 and maximum salt length
     signature = private_key.sign(
         message_bytes,
-        padding.PSS(
-            mgf=padding.MGF1(hashes.SHA256()),
-            salt_length=padding.PSS.MAX_LENGTH
-        ),
-        hashes.SHA256()
+        _PSS_SHA256,
+        _SHA256
     )
     
     return signature
@@ -230,11 +321,7 @@ def encrypt_with_public_key(data: bytes, public_key: rsa.RSAPublicKey) -> bytes:
     # Encrypt using RSA/OAEP with SHA-256
     ciphertext = public_key.encrypt(
         data,
-        padding.OAEP(
-            mgf=padding.MGF1(algorithm=hashes.SHA256()),
-            algorithm=hashes.SHA256(),
-            label=None
-        )
+        _OAEP_SHA256
     )
     
     return ciphertext